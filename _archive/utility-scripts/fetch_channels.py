@@ -4,7 +4,8 @@ Fetch channels data from MongoDB and store to channels.json
 
 Usage:
     python fetch_channels.py
-    
+    python fetch_channels.py --count-only    # report counts, no fetch/write
+
 Requirements:
     pip install pymongo python-dotenv
 
@@ -14,18 +15,27 @@ Environment Variables:
 
 import os
 import json
+import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
 
 try:
+    from bson import json_util
     from pymongo import MongoClient
+    from pymongo.errors import OperationFailure
     from dotenv import load_dotenv
 except ImportError:
     print("❌ Missing required packages. Install them with:")
     print("   pip install pymongo python-dotenv")
     sys.exit(1)
 
+# orjson serializes ~5x faster than stdlib json; fall back silently if missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def get_mongo_uri():
     """Load MongoDB URI from environment or .env file"""
@@ -47,68 +57,159 @@ def get_mongo_uri():
     return mongo_uri
 
 
-def serialize_object_id(obj):
-    """Convert MongoDB ObjectId to string for JSON serialization"""
-    if hasattr(obj, '__iter__') and not isinstance(obj, (str, dict)):
-        return [serialize_object_id(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: serialize_object_id(value) for key, value in obj.items()}
-    elif hasattr(obj, 'isoformat'):  # datetime objects
-        return obj.isoformat()
-    elif hasattr(obj, '__str__') and type(obj).__name__ == 'ObjectId':
-        return str(obj)
-    else:
-        return obj
+# Channel documents carry full item arrays, so pull them in modest batches
+# instead of letting the driver buffer huge default batches at once
+CURSOR_BATCH_SIZE = 100
+
+# Only the fields transform_channel actually reads - trims each document
+# server-side before it crosses the wire
+CHANNEL_PROJECTION = {
+    "name": 1,
+    "playlistStartEpoch": 1,
+    "items._id": 1,
+    "items.title": 1,
+    "items.youtubeId": 1,
+    "items.duration": 1,
+    "items.year": 1,
+    "items.tags": 1,
+    "items.category": 1,
+}
+
+
+# Server-side equivalent of transform_channels: stringify IDs, format the
+# start epoch, and default missing item fields in a single $project
+CHANNEL_TRANSFORM_PIPELINE = [
+    {"$project": {
+        "_id": {"$toString": "$_id"},
+        "name": {"$ifNull": ["$name", ""]},
+        "playlistStartEpoch": {
+            "$cond": [
+                {"$eq": [{"$type": "$playlistStartEpoch"}, "date"]},
+                # Pinned to the .000Z form JS Date.toISOString() produces
+                # (see server/utils/checksum.js); the Python fallback
+                # transform emits the same
+                {"$dateToString": {
+                    "date": "$playlistStartEpoch",
+                    "format": "%Y-%m-%dT%H:%M:%S.%LZ",
+                }},
+                {"$ifNull": ["$playlistStartEpoch", ""]},
+            ]
+        },
+        "items": {
+            "$map": {
+                "input": {"$ifNull": ["$items", []]},
+                "as": "item",
+                "in": {
+                    "_id": {"$toString": "$$item._id"},
+                    "title": {"$ifNull": ["$$item.title", ""]},
+                    "youtubeId": {"$ifNull": ["$$item.youtubeId", ""]},
+                    "duration": {"$ifNull": ["$$item.duration", 30]},
+                    "year": {"$ifNull": ["$$item.year", None]},
+                    "tags": {"$ifNull": ["$$item.tags", []]},
+                    "category": {"$ifNull": ["$$item.category", None]},
+                },
+            }
+        },
+    }}
+]
 
 
-def fetch_channels_from_mongodb(mongo_uri):
-    """Connect to MongoDB and fetch all channels"""
+def connect_to_mongodb(mongo_uri):
+    """Create the single MongoClient shared by all queries"""
     print("🔌 Connecting to MongoDB...")
-    
+
     try:
         client = MongoClient(mongo_uri)
         # Test the connection
         client.admin.command('ping')
         print("✅ Connected to MongoDB successfully!")
+        return client
     except Exception as e:
         print(f"❌ Failed to connect to MongoDB: {e}")
         sys.exit(1)
-    
-    # Get the database (extract from URI or use default)
-    db = client.get_default_database()
-    if db is None:
-        # Fallback to 'retro-tv' database name
-        db = client['retro-tv']
-    
+
+
+def fetch_channels_from_mongodb(client):
+    """Open a cursor over all channels using the shared client
+
+    Returns (cursor, transformed) - transformed is True when the server
+    already applied the JSON transform via aggregation. The cursor is
+    consumed by the caller so documents stream one batch at a time instead
+    of all being materialized up front; None when the collection is empty.
+    """
+    # Get the database from the URI, defaulting to 'retro-tv'
+    db = client.get_default_database('retro-tv')
+
     print(f"📦 Using database: {db.name}")
-    
-    # Fetch all channels from the 'channels' collection
+
     channels_collection = db['channels']
-    channels = list(channels_collection.find({}))
-    
-    print(f"📺 Found {len(channels)} channels")
-    
-    client.close()
-    return channels
+    total = channels_collection.count_documents({})
+    print(f"📺 Found {total} channels")
 
+    if total == 0:
+        return None, False
 
-def transform_channels(channels):
-    """Transform MongoDB documents to the expected JSON format"""
-    transformed = []
-    
-    for channel in channels:
-        transformed_channel = {
-            "_id": str(channel.get("_id", "")),
-            "name": channel.get("name", ""),
-            "playlistStartEpoch": channel.get("playlistStartEpoch", "").isoformat() 
-                if hasattr(channel.get("playlistStartEpoch", ""), 'isoformat') 
-                else channel.get("playlistStartEpoch", ""),
-            "items": []
-        }
-        
-        # Transform items (videos)
-        for item in channel.get("items", []):
-            transformed_item = {
+    # Cursor over the 'channels' collection, transforming server-side where
+    # the server supports the pipeline
+    try:
+        cursor = channels_collection.aggregate(
+            CHANNEL_TRANSFORM_PIPELINE, batchSize=CURSOR_BATCH_SIZE)
+        transformed = True
+    except OperationFailure as e:
+        print(f"⚠️  Server-side transform unavailable ({e}), falling back")
+        cursor = channels_collection.find({}, CHANNEL_PROJECTION).batch_size(CURSOR_BATCH_SIZE)
+        transformed = False
+
+    return cursor, transformed
+
+
+def report_counts(client):
+    """Report channel/video totals server-side without fetching documents"""
+    db = client.get_default_database('retro-tv')
+    print(f"📦 Using database: {db.name}")
+
+    result = list(db['channels'].aggregate([
+        {"$group": {
+            "_id": None,
+            "channels": {"$sum": 1},
+            "videos": {"$sum": {"$size": {"$ifNull": ["$items", []]}}},
+        }}
+    ]))
+
+    total_channels = result[0]["channels"] if result else 0
+    total_videos = result[0]["videos"] if result else 0
+    print(f"   Total channels: {total_channels}")
+    print(f"   Total videos: {total_videos}")
+
+
+def transform_channel(channel):
+    """Transform one MongoDB document to the expected JSON format
+
+    Fallback for when the server-side pipeline is unavailable. Items are
+    well-formed in practice, so index directly and only take the defaulted
+    path when a KeyError proves otherwise.
+    """
+    epoch = channel.get("playlistStartEpoch", "")
+    if hasattr(epoch, 'isoformat'):  # datetime objects
+        # Same .000Z form as the aggregation's $dateToString
+        epoch = epoch.isoformat(timespec='milliseconds') + 'Z'
+
+    items = []
+    # Transform items (videos)
+    for item in channel.get("items", []):
+        try:
+            items.append({
+                "_id": str(item["_id"]),
+                "title": item["title"],
+                "youtubeId": item["youtubeId"],
+                "duration": item["duration"],
+                "year": item.get("year"),
+                "tags": item["tags"],
+                "category": item.get("category")
+            })
+        except KeyError:
+            # Rare malformed item - fall back to per-field defaults
+            items.append({
                 "_id": str(item.get("_id", "")),
                 "title": item.get("title", ""),
                 "youtubeId": item.get("youtubeId", ""),
@@ -116,32 +217,71 @@ def transform_channels(channels):
                 "year": item.get("year"),
                 "tags": item.get("tags", []),
                 "category": item.get("category")
-            }
-            transformed_channel["items"].append(transformed_item)
-        
-        transformed.append(transformed_channel)
-        print(f"  📺 {channel.get('name', 'Unknown')}: {len(channel.get('items', []))} videos")
-    
-    return transformed
+            })
+
+    return {
+        "_id": str(channel.get("_id", "")),
+        "name": channel.get("name", ""),
+        "playlistStartEpoch": epoch,
+        "items": items
+    }
+
+
+def iter_transformed(cursor, transformed):
+    """Yield finished channels from the cursor one at a time
+
+    Applies the Python transform per document when the server could not, so
+    only one raw and one transformed channel are alive at once.
+    """
+    for channel in cursor:
+        if not transformed:
+            channel = transform_channel(channel)
+        print(f"  📺 {channel['name'] or 'Unknown'}: {len(channel['items'])} videos")
+        yield channel
+
+
+def dumps_channel(channel):
+    """Serialize a single channel document to an indented JSON string"""
+    # json_util handles any BSON types (ObjectId etc.) the transform missed
+    if orjson is not None:
+        return orjson.dumps(
+            channel, option=orjson.OPT_INDENT_2, default=json_util.default
+        ).decode('utf-8')
+    return json.dumps(channel, indent=2, ensure_ascii=False, default=json_util.default)
 
 
 def save_to_json(channels, output_path):
-    """Save channels data to JSON file"""
-    # Create the output structure matching the existing format
-    output_data = {
-        "version": int(datetime.now().timestamp() * 1000),
-        "generatedAt": datetime.now().isoformat() + "Z",
-        "channels": channels
-    }
-    
+    """Stream channels data to a JSON file
+
+    Accepts any iterable (including a cursor-backed generator), writes the
+    envelope by hand, and serializes one channel at a time, so neither the
+    channel list nor the multi-MB document ever exists whole in memory.
+    Output matches the existing format. Returns (channel_count, video_count).
+    """
     # Ensure directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
+
+    channel_count = 0
+    video_count = 0
+
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
-    
+        f.write('{\n')
+        f.write(f'  "version": {int(datetime.now().timestamp() * 1000)},\n')
+        f.write(f'  "generatedAt": {json.dumps(datetime.now().isoformat() + "Z")},\n')
+        f.write('  "channels": [\n')
+
+        for channel in channels:
+            if channel_count:
+                f.write(',\n')
+            channel_count += 1
+            video_count += len(channel['items'])
+            # Re-indent the channel document to sit inside the array
+            f.write('    ' + dumps_channel(channel).replace('\n', '\n    '))
+
+        f.write('\n  ]\n}')
+
     print(f"💾 Saved to: {output_path}")
-    return output_path
+    return channel_count, video_count
 
 
 def main():
@@ -159,27 +299,40 @@ def main():
     
     # Get MongoDB URI
     mongo_uri = get_mongo_uri()
-    
-    # Fetch channels from MongoDB
-    channels = fetch_channels_from_mongodb(mongo_uri)
-    
-    if not channels:
-        print("⚠️  No channels found in database!")
-        sys.exit(0)
-    
-    # Transform channels to JSON format
-    print("\n🔄 Transforming channel data...")
-    transformed_channels = transform_channels(channels)
-    
-    # Save to JSON files
-    print("\n💾 Saving to JSON files...")
-    for output_path in output_paths:
-        save_to_json(transformed_channels, output_path)
-    
+
+    # One client for the whole run
+    client = connect_to_mongodb(mongo_uri)
+
+    try:
+        # Count-only mode: let the server count, skip fetch and write
+        if "--count-only" in sys.argv:
+            report_counts(client)
+            return
+
+        # Open the channel cursor
+        cursor, transformed = fetch_channels_from_mongodb(client)
+
+        if cursor is None:
+            print("⚠️  No channels found in database!")
+            sys.exit(0)
+
+        # Stream cursor -> transform -> primary output file, then mirror the
+        # finished file instead of holding all channels to serialize twice
+        print("\n🔄 Transforming and saving channel data...")
+        primary, *mirrors = output_paths
+        total_channels, total_videos = save_to_json(
+            iter_transformed(cursor, transformed), primary)
+    finally:
+        client.close()
+
+    for mirror in mirrors:
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(primary, mirror)
+        print(f"💾 Saved to: {mirror}")
+
     print("\n" + "=" * 50)
     print("✅ Successfully fetched and saved channel data!")
-    print(f"   Total channels: {len(transformed_channels)}")
-    total_videos = sum(len(ch.get('items', [])) for ch in transformed_channels)
+    print(f"   Total channels: {total_channels}")
     print(f"   Total videos: {total_videos}")
     print("=" * 50)
 
@@ -5,24 +5,26 @@ Uses YouTube Data API to search and verify links.
 
 Usage:
     python fetch_honey_singh_videos.py
+    python fetch_honey_singh_videos.py --refresh   # ignore cached search results
 
 Requirements:
-    pip install google-api-python-client
+    pip install aiohttp
 
 Environment Variables:
     YOUTUBE_API_KEY - Your YouTube Data API key
 """
 
+import asyncio
+import json
 import os
 import sys
 from pathlib import Path
 
 try:
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
+    import aiohttp
 except ImportError:
     print("❌ Missing required package. Install with:")
-    print("   pip install google-api-python-client")
+    print("   pip install aiohttp")
     sys.exit(1)
 
 # Load environment variables
@@ -34,6 +36,17 @@ except ImportError:
     pass
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
+
+# Cap concurrent in-flight requests to stay under the API's per-second quota
+MAX_CONCURRENT_REQUESTS = 10
+
+# Search results cached on disk so reruns don't re-spend API quota
+CACHE_FILE = Path(__file__).parent / ".youtube_search_cache.json"
+
+# Sentinel for searches that errored (quota, network) - unlike a genuine
+# empty result (None) these must never be written to the cache
+SEARCH_FAILED = object()
 
 # OG Honey Singh songs to search (2011-2015 era)
 SONGS_TO_FETCH = [
@@ -42,7 +55,7 @@ SONGS_TO_FETCH = [
     "Blue Eyes Yo Yo Honey Singh Blockbuster",
     "Desi Kalakaar Yo Yo Honey Singh Sonakshi",
     "Love Dose Yo Yo Honey Singh Urvashi",
-    
+
     # Punjabi collaborations
     "Angreji Beat Yo Yo Honey Singh Gippy Grewal",
     "High Heels Jaz Dhami Honey Singh",
@@ -53,7 +66,7 @@ SONGS_TO_FETCH = [
     "Morni Banke Honey Singh Punjabi",
     "Aashiq Banaya Aapne Honey Singh",
     "This Party Getting Hot Honey Singh",
-    
+
     # Bollywood songs
     "Lungi Dance Chennai Express Shah Rukh Khan Honey Singh",
     "Party All Night Boss Akshay Kumar Honey Singh",
@@ -73,7 +86,7 @@ SONGS_TO_FETCH = [
     "Yaar Naa Miley Kick Honey Singh",
     "Aankhon Aankhon Bhaag Johnny Honey Singh",
     "Dheere Dheere Hrithik Sonam Honey Singh",
-    
+
     # Early Punjabi underground/cult classics
     "Panga Diljit Dosanjh Honey Singh",
     "Glassi Honey Singh Punjabi",
@@ -81,60 +94,176 @@ SONGS_TO_FETCH = [
 ]
 
 
-def search_youtube_video(youtube, query, max_results=1):
+def normalize_query(query):
+    """Lowercase and collapse whitespace so near-duplicate queries compare equal"""
+    return " ".join(query.lower().split())
+
+
+def dedupe_songs(songs):
+    """Drop duplicate queries (after normalization), preserving order"""
+    seen = set()
+    unique = []
+    for song in songs:
+        key = normalize_query(song)
+        if key not in seen:
+            seen.add(key)
+            unique.append(song)
+    return unique
+
+
+def load_search_cache():
+    """Load cached search results (query -> result dict, or None for misses)"""
+    if CACHE_FILE.exists():
+        try:
+            return json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            pass
+    return {}
+
+
+def save_search_cache(cache):
+    """Persist search results for future runs"""
+    CACHE_FILE.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+
+
+async def search_youtube_video(session, semaphore, query, max_results=1):
     """Search for a YouTube video and return the most relevant result."""
+    params = {
+        "q": query,
+        "part": "id,snippet",
+        "maxResults": max_results,
+        "type": "video",
+        "videoDuration": "medium",  # Filter out shorts (short) and very long videos
+        "order": "relevance",
+        "key": YOUTUBE_API_KEY,
+    }
     try:
-        search_response = youtube.search().list(
-            q=query,
-            part="id,snippet",
-            maxResults=max_results,
-            type="video",
-            videoDuration="medium",  # Filter out shorts (short) and very long videos
-            order="relevance"
-        ).execute()
-        
-        for item in search_response.get("items", []):
-            video_id = item["id"]["videoId"]
-            title = item["snippet"]["title"]
-            channel = item["snippet"]["channelTitle"]
-            
-            # Basic filtering - skip lyrics/audio only
-            title_lower = title.lower()
-            if "lyric" in title_lower or "audio only" in title_lower:
-                continue
-                
-            return {
-                "video_id": video_id,
-                "title": title,
-                "channel": channel,
-                "url": f"https://www.youtube.com/watch?v={video_id}"
-            }
-        
-        return None
-    except HttpError as e:
+        async with semaphore:
+            async with session.get(f"{YOUTUBE_API_BASE}/search", params=params) as response:
+                if response.status != 200:
+                    print(f"❌ API Error: HTTP {response.status} for '{query[:40]}'")
+                    return SEARCH_FAILED
+                search_response = await response.json()
+    except aiohttp.ClientError as e:
         print(f"❌ API Error: {e}")
-        return None
+        return SEARCH_FAILED
+
+    for item in search_response.get("items", []):
+        video_id = item["id"]["videoId"]
+        title = item["snippet"]["title"]
+        channel = item["snippet"]["channelTitle"]
+
+        # Basic filtering - skip lyrics/audio only
+        title_lower = title.lower()
+        if "lyric" in title_lower or "audio only" in title_lower:
+            continue
+
+        return {
+            "video_id": video_id,
+            "title": title,
+            "channel": channel,
+            "url": f"https://www.youtube.com/watch?v={video_id}"
+        }
 
+    return None
 
-def get_video_details(youtube, video_id):
-    """Get video details to verify it's a proper video (not short)."""
+
+async def get_video_details(session, semaphore, video_ids):
+    """Get details for up to 50 videos in a single videos.list call."""
+    params = {
+        "part": "contentDetails,statistics",
+        "id": ",".join(video_ids),
+        "key": YOUTUBE_API_KEY,
+    }
     try:
-        response = youtube.videos().list(
-            part="contentDetails,statistics",
-            id=video_id
-        ).execute()
-        
-        if response.get("items"):
-            item = response["items"][0]
-            duration = item["contentDetails"]["duration"]
-            view_count = int(item["statistics"].get("viewCount", 0))
-            return {
-                "duration": duration,
-                "views": view_count
-            }
-        return None
-    except HttpError:
-        return None
+        async with semaphore:
+            async with session.get(f"{YOUTUBE_API_BASE}/videos", params=params) as response:
+                if response.status != 200:
+                    return {}
+                data = await response.json()
+    except aiohttp.ClientError:
+        return {}
+
+    details = {}
+    for item in data.get("items", []):
+        details[item["id"]] = {
+            "duration": item["contentDetails"]["duration"],
+            "views": int(item["statistics"].get("viewCount", 0))
+        }
+    return details
+
+
+async def fetch_videos(refresh=False):
+    """Search all songs concurrently, then verify view counts."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    found_videos = []
+    seen_ids = set()  # Track unique video IDs
+
+    cache = {} if refresh else load_search_cache()
+
+    # Don't spend quota searching the same song twice
+    songs = dedupe_songs(SONGS_TO_FETCH)
+    if len(songs) < len(SONGS_TO_FETCH):
+        print(f"\n🧹 Dropped {len(SONGS_TO_FETCH) - len(songs)} duplicate queries")
+
+    async with aiohttp.ClientSession() as session:
+        print(f"\n🔍 Searching for {len(songs)} songs...\n")
+
+        uncached = [query for query in songs if query not in cache]
+        if len(uncached) < len(songs):
+            print(f"📦 {len(songs) - len(uncached)} results from cache\n")
+
+        if uncached:
+            tasks = [search_youtube_video(session, semaphore, query) for query in uncached]
+            failed = 0
+            for query, result in zip(uncached, await asyncio.gather(*tasks)):
+                # Only cache searches that actually completed - a 403/5xx or
+                # network error must stay retryable on the next run
+                if result is SEARCH_FAILED:
+                    failed += 1
+                else:
+                    cache[query] = result
+            save_search_cache(cache)
+            if failed:
+                print(f"⚠️  {failed} searches failed and were not cached; rerun to retry\n")
+
+        results = [cache.get(query) for query in songs]
+
+        # Deduplicate before verification
+        unique_results = []
+        for i, (query, result) in enumerate(zip(songs, results), 1):
+            print(f"[{i}/{len(songs)}] {query[:50]}...")
+
+            if not result:
+                print(f"   ❌ Not found")
+                continue
+
+            if result["video_id"] in seen_ids:
+                print(f"   ⏭️  Duplicate skipped")
+                continue
+
+            seen_ids.add(result["video_id"])
+            unique_results.append(result)
+
+        # Verify view counts in batches of 50 IDs per call (filter out random uploads)
+        video_ids = [result["video_id"] for result in unique_results]
+        detail_tasks = [
+            get_video_details(session, semaphore, video_ids[i:i + 50])
+            for i in range(0, len(video_ids), 50)
+        ]
+        details_by_id = {}
+        for chunk_details in await asyncio.gather(*detail_tasks):
+            details_by_id.update(chunk_details)
+
+    for result in unique_results:
+        details = details_by_id.get(result["video_id"])
+        if details and details["views"] > 100000:  # At least 100K views
+            found_videos.append(result)
+            print(f"   ✅ Found: {result['title'][:50]}... ({details['views']:,} views)")
+        else:
+            print(f"   ⚠️  Skipped (low views): {result['title'][:40]}...")
+
+    return found_videos
 
 
 def main():
@@ -143,53 +272,26 @@ def main():
         print("   Set it in your .env file or as an environment variable")
         print("   Get one from: https://console.cloud.google.com/apis/credentials")
         sys.exit(1)
-    
+
     print("=" * 60)
     print("🎵 Honey Singh OG Era Video Fetcher")
     print("=" * 60)
-    
-    # Build YouTube API client
-    youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
-    
+
+    found_videos = asyncio.run(fetch_videos(refresh="--refresh" in sys.argv))
+
     output_file = Path(__file__).parent.parent / "honey.txt"
-    found_videos = []
-    seen_ids = set()  # Track unique video IDs
-    
-    print(f"\n🔍 Searching for {len(SONGS_TO_FETCH)} songs...\n")
-    
-    for i, query in enumerate(SONGS_TO_FETCH, 1):
-        print(f"[{i}/{len(SONGS_TO_FETCH)}] Searching: {query[:50]}...")
-        
-        result = search_youtube_video(youtube, query)
-        
-        if result:
-            # Skip duplicates
-            if result["video_id"] in seen_ids:
-                print(f"   ⏭️  Duplicate skipped")
-                continue
-                
-            # Verify it has decent views (filter out random uploads)
-            details = get_video_details(youtube, result["video_id"])
-            if details and details["views"] > 100000:  # At least 100K views
-                found_videos.append(result)
-                seen_ids.add(result["video_id"])
-                print(f"   ✅ Found: {result['title'][:50]}... ({details['views']:,} views)")
-            else:
-                print(f"   ⚠️  Skipped (low views): {result['title'][:40]}...")
-        else:
-            print(f"   ❌ Not found")
-    
+
     # Write to file
     print(f"\n💾 Writing {len(found_videos)} videos to {output_file}")
-    
+
     with open(output_file, "w") as f:
         f.write("# Yo Yo Honey Singh - OG Era YouTube Video Links\n")
         f.write("# Auto-generated via YouTube API\n")
         f.write(f"# Total: {len(found_videos)} verified videos\n\n")
-        
+
         for video in found_videos:
             f.write(f"{video['url']}\n")
-    
+
     print("\n" + "=" * 60)
     print(f"✅ Done! {len(found_videos)} video links saved to honey.txt")
     print("=" * 60)
@@ -7,8 +7,15 @@ Removes AI-generated footprints and cleans up code style
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# google-re2 scans in guaranteed linear time; fall back to stdlib re if absent
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 # Root directory (adjust if needed)
 ROOT_DIR = Path(__file__).parent.parent
 
@@ -72,6 +79,32 @@ AI_LINE_PATTERNS = [
     r'^(\s*)//\s*$',
 ]
 
+def compile_line_regex(pattern):
+    """Compile the line-scan regex with re2 when available, else stdlib re"""
+    if re2 is not None:
+        try:
+            return re2.compile(pattern, re2.IGNORECASE)
+        except re2.error:
+            pass  # pattern uses a construct re2 doesn't support
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def compile_line_union(patterns):
+    """Union a pattern list into one compiled alternation"""
+    return compile_line_regex('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+# Comment-marker style per extension, so each file only pays for the
+# patterns that can actually match it (.md/.html may embed either style)
+SLASH_COMMENT_EXTENSIONS = {'.js', '.jsx', '.ts', '.tsx', '.css', '.scss'}
+HASH_COMMENT_EXTENSIONS = {'.py', '.sh', '.yaml', '.yml'}
+
+# Union of line patterns, compiled once - one engine pass per line instead
+# of ~40 separate re.search calls - with narrowed variants per comment style
+AI_LINE_RE = compile_line_union(AI_LINE_PATTERNS)
+AI_SLASH_LINE_RE = compile_line_union([p for p in AI_LINE_PATTERNS if '//' in p])
+AI_HASH_LINE_RE = compile_line_union([p for p in AI_LINE_PATTERNS if '# ' in p])
+
 # Additional patterns to detect and flag
 AI_TELLTALE_PATTERNS = [
     r'certainly!',
@@ -98,11 +131,24 @@ AI_REPLACE_PATTERNS = [
 # Patterns that are suspicious but need manual review
 SUSPICIOUS_PATTERNS = [
     r'TODO:\s*(implement|add|fix)\s+this',
-    r'FIXME:\s*(implement|add|fix)\s+this', 
+    r'FIXME:\s*(implement|add|fix)\s+this',
     r'//\s*\.\.\.',
     r'placeholder',
 ]
 
+# Replace patterns compiled once at import; applied per line by
+# sanitize_lines, so no MULTILINE flag is needed
+AI_REPLACE_RES = [
+    (re.compile(pattern), replacement)
+    for pattern, replacement in AI_REPLACE_PATTERNS
+]
+
+# Suspicious/telltale patterns stay per-pattern (the report counts matches
+# per pattern, so a union would lose that), but compile them once here
+# instead of leaning on the re internal cache per file
+SUSPICIOUS_RES = [re.compile(pattern, re.IGNORECASE) for pattern in SUSPICIOUS_PATTERNS]
+AI_TELLTALE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in AI_TELLTALE_PATTERNS]
+
 # Comment density threshold (comments per code line)
 MAX_COMMENT_DENSITY = 0.4
 
@@ -134,75 +180,124 @@ class CodeSanitizer:
         
         return True
     
-    def remove_ai_lines(self, content, file_ext):
-        """Remove lines matching AI footprint patterns"""
-        lines = content.split('\n')
+    def iter_files(self, directory):
+        """Yield file paths via os.scandir recursion, skipping SKIP_DIRS
+
+        scandir reuses the dirent type info from the OS, avoiding the extra
+        stat call per entry and the Path(root) / file joins os.walk needs.
+        """
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            print(f"Error scanning {directory}: {e}")
+            return
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        yield from self.iter_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield Path(entry.path)
+
+    def sanitize_lines(self, lines, file_ext):
+        """Single pass over an iterable of lines: drop AI footprint lines,
+        apply replacements, and cap blank runs at two.
+
+        Returns (cleaned_lines, removed, replaced, changed).
+        """
         cleaned_lines = []
         removed = 0
-        
+        replaced = 0
+        blank_run = 0
+        changed = False
+
+        # Narrow the pattern set to the file's comment style
+        slash_only = file_ext in SLASH_COMMENT_EXTENSIONS
+        hash_only = file_ext in HASH_COMMENT_EXTENSIONS
+        if slash_only:
+            line_re = AI_SLASH_LINE_RE
+        elif hash_only:
+            line_re = AI_HASH_LINE_RE
+        else:
+            line_re = AI_LINE_RE
+        # The replace patterns are all //-style
+        replace_patterns = () if hash_only else AI_REPLACE_RES
+
         for line in lines:
-            should_remove = False
-            
-            for pattern in AI_LINE_PATTERNS:
-                if re.search(pattern, line, re.IGNORECASE):
-                    should_remove = True
+            # Every removal/replace pattern targets a // or # comment, so a
+            # substring check (C-level memchr) pre-filters lines before the
+            # regex engine
+            if slash_only:
+                has_comment = '//' in line
+            elif hash_only:
+                has_comment = '#' in line
+            else:
+                has_comment = '//' in line or '#' in line
+
+            if has_comment:
+                if line_re.search(line):
                     removed += 1
                     if self.verbose:
                         print(f"  Removing: {line.strip()[:60]}...")
-                    break
-            
-            if not should_remove:
-                cleaned_lines.append(line)
-        
-        self.stats['lines_removed'] += removed
-        return '\n'.join(cleaned_lines)
-    
-    def apply_replacements(self, content):
-        """Apply pattern replacements"""
-        replaced = 0
-        
-        for pattern, replacement in AI_REPLACE_PATTERNS:
-            new_content, count = re.subn(pattern, replacement, content, flags=re.MULTILINE)
-            if count > 0:
-                content = new_content
-                replaced += count
-        
-        self.stats['patterns_replaced'] += replaced
-        return content
-    
+                    continue
+
+                # All replace patterns are line-scoped, so apply them here
+                # instead of in a separate MULTILINE pass over the content
+                for pattern, replacement in replace_patterns:
+                    line, count = pattern.subn(replacement, line)
+                    replaced += count
+
+            # Cap runs of truly empty lines at 2 (was a \n{4,} pass over
+            # content). Whitespace-bearing lines reset the run: they never
+            # matched the baseline regex and can be significant (YAML block
+            # scalars, Python triple-quoted strings)
+            if line in ('\n', ''):
+                blank_run += 1
+                if blank_run > 2:
+                    changed = True
+                    continue
+            else:
+                blank_run = 0
+
+            cleaned_lines.append(line)
+
+        changed = changed or removed > 0 or replaced > 0
+        return cleaned_lines, removed, replaced, changed
+
     def clean_empty_comment_blocks(self, content):
-        """Remove empty or near-empty comment blocks"""
-        # Remove empty multiline comment blocks
-        content = re.sub(r'/\*+\s*\*+/', '', content)
-        
-        # Remove consecutive empty single-line comments
-        content = re.sub(r'(\n\s*//\s*){3,}', '\n', content)
-        
-        # Clean up multiple blank lines (max 2)
-        content = re.sub(r'\n{4,}', '\n\n\n', content)
-        
+        """Remove empty multiline comment blocks (only cross-line cleanup left)"""
+        content, count = re.subn(r'/\*+\s*\*+/', '', content)
+        if count:
+            # A gutted block line can fuse neighbouring blank runs past the
+            # cap the line pass enforced, so re-squeeze to max 2 blank lines
+            content = re.sub(r'\n{4,}', '\n\n\n', content)
         return content
     
     def check_suspicious(self, content, file_path):
         """Flag suspicious patterns for manual review"""
-        for pattern in SUSPICIOUS_PATTERNS:
-            matches = re.findall(pattern, content, re.IGNORECASE)
+        suspicious = []
+
+        for regex in SUSPICIOUS_RES:
+            matches = regex.findall(content)
             if matches:
-                self.stats['suspicious_found'].append({
+                suspicious.append({
                     'file': str(file_path),
-                    'pattern': pattern,
+                    'pattern': regex.pattern,
                     'count': len(matches)
                 })
-        
+
         # Check for AI telltale patterns
-        for pattern in AI_TELLTALE_PATTERNS:
-            matches = re.findall(pattern, content, re.IGNORECASE)
+        for regex in AI_TELLTALE_RES:
+            matches = regex.findall(content)
             if matches:
-                self.stats['suspicious_found'].append({
+                suspicious.append({
                     'file': str(file_path),
-                    'pattern': f'AI-telltale: {pattern}',
+                    'pattern': f'AI-telltale: {regex.pattern}',
                     'count': len(matches)
                 })
+
+        return suspicious
     
     def normalize_comment_style(self, content, file_ext):
         """Normalize comment formatting"""
@@ -220,62 +315,84 @@ class CodeSanitizer:
         return content
     
     def process_file(self, file_path):
-        """Process a single file"""
+        """Process a single file; returns (modified, per-file stats)"""
+        file_ext = Path(file_path).suffix.lower()
+        file_stats = {
+            'lines_removed': 0,
+            'patterns_replaced': 0,
+            'suspicious_found': [],
+        }
+
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                original_content = f.read()
+                if file_ext != '.json':
+                    # Stream line-by-line instead of read() + split('\n') so
+                    # the whole file is never held in memory twice
+                    cleaned_lines, removed, replaced, changed = self.sanitize_lines(f, file_ext)
+                    content = ''.join(cleaned_lines)
+                    file_stats['lines_removed'] = removed
+                    file_stats['patterns_replaced'] = replaced
+                else:
+                    content = f.read()
+                    changed = False
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
-            return False
-        
-        file_ext = Path(file_path).suffix.lower()
-        content = original_content
-        
+            return False, file_stats
+
         # Skip JSON files from comment removal (no comments in JSON)
-        if file_ext != '.json':
-            content = self.remove_ai_lines(content, file_ext)
-            content = self.apply_replacements(content)
-            content = self.clean_empty_comment_blocks(content)
-            content = self.normalize_comment_style(content, file_ext)
-        
+        # In dry-run mode the content passes only matter while changed is
+        # still False - once the line scan hit, the verdict is already in
+        if file_ext != '.json' and not (self.dry_run and changed):
+            new_content = self.clean_empty_comment_blocks(content)
+            new_content = self.normalize_comment_style(new_content, file_ext)
+            changed = changed or new_content != content
+            content = new_content
+
         # Check for suspicious patterns
-        self.check_suspicious(content, file_path)
-        
+        file_stats['suspicious_found'] = self.check_suspicious(content, file_path)
+
         # Only write if changed
-        if content != original_content:
+        if changed:
             if not self.dry_run:
                 try:
                     with open(file_path, 'w', encoding='utf-8') as f:
                         f.write(content)
                 except Exception as e:
                     print(f"Error writing {file_path}: {e}")
-                    return False
-            
-            self.stats['files_modified'] += 1
-            return True
-        
-        return False
+                    return False, file_stats
+
+            return True, file_stats
+
+        return False, file_stats
     
     def run(self):
         """Run sanitization on entire codebase"""
         print(f"{'[DRY RUN] ' if self.dry_run else ''}Scanning {self.root_dir}...")
         print("-" * 60)
         
-        for root, dirs, files in os.walk(self.root_dir):
-            # Skip directories
-            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-            
-            for file in files:
-                file_path = Path(root) / file
-                
-                if self.should_process_file(file_path):
-                    self.stats['files_processed'] += 1
-                    modified = self.process_file(file_path)
-                    
-                    if modified and self.verbose:
+        file_paths = [
+            file_path for file_path in self.iter_files(self.root_dir)
+            if self.should_process_file(file_path)
+        ]
+
+        self.stats['files_processed'] = len(file_paths)
+
+        # Files are independent, so fan them out across CPU cores; workers
+        # return their per-file stats for merging here
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(self.process_file, file_paths, chunksize=16)
+
+            for file_path, (modified, file_stats) in zip(file_paths, results):
+                self.stats['lines_removed'] += file_stats['lines_removed']
+                self.stats['patterns_replaced'] += file_stats['patterns_replaced']
+                self.stats['suspicious_found'].extend(file_stats['suspicious_found'])
+
+                if modified:
+                    self.stats['files_modified'] += 1
+                    if self.verbose:
                         rel_path = file_path.relative_to(self.root_dir)
                         print(f"Modified: {rel_path}")
-        
+
         self.print_report()
     
     def print_report(self):